@@ -1,26 +1,61 @@
+using System.Collections.Concurrent;
 using System.Diagnostics;
+using System.IO.Enumeration;
+using System.Security.Cryptography;
 using System.Text;
-using System.Text.Json;
 using System.Text.RegularExpressions;
+using System.Threading.Channels;
 
 namespace GitPuller
 {
     class Program
     {
         static readonly object ConsoleLock = new object();
-        static int MaxDegreeOfParallelism = 6;
-        const int DefaultMaxDegreeOfParallelism = 6;
+
+        // Preformatted (color, text) output from workers; drained by a single writer thread.
+        // An empty item only refreshes the progress bar.
+        static readonly BlockingCollection<List<(ConsoleColor Color, string Text)>> OutputQueue =
+            new BlockingCollection<List<(ConsoleColor Color, string Text)>>();
+        // Workers mostly wait on the network, so oversubscribe the CPU count (capped).
+        static readonly int DefaultMaxDegreeOfParallelism = Math.Min(32, Environment.ProcessorCount * 4);
+        static int MaxDegreeOfParallelism = DefaultMaxDegreeOfParallelism;
         static bool InitMissingSubmodules = true;
         static bool ForceSync = false;
         static bool CleanUntracked = false;
         static bool ForceRescan = false;
         static bool PullFfOnly = true;
+        static bool ShallowFetch = false;
+        static bool LowPriority = false;
+        static bool FastCheck = false;
         static bool ShowHelp = false;
         static string RootDir = AppContext.BaseDirectory;
-        const string CacheFileName = ".git_repo_cache.json";
+        static int MaxScanDepth = DefaultMaxScanDepth;
+        const int DefaultMaxScanDepth = 6;
+        const string CacheFileName = ".git_repo_cache.bin";
+        const string LegacyCacheFileName = ".git_repo_cache.json";
+        // Written in place of the fingerprint when a cached path turned out not to be a repo,
+        // so the next run rescans instead of trusting the list.
+        const long StaleFingerprint = 0;
+        static volatile bool CacheStale = false;
+        const int CacheFormatVersion = 2;
         static int GitTimeout = 60000; // Default 60s
         const int DefaultGitTimeoutSeconds = 60;
         const int MinGitTimeoutSeconds = 1;
+        static int MinPullIntervalSeconds = DefaultMinPullIntervalSeconds;
+        const int DefaultMinPullIntervalSeconds = 300;
+        static int SubmoduleJobs = DefaultSubmoduleJobs;
+        const int DefaultSubmoduleJobs = 4;
+
+        // `git submodule update --jobs` appeared in git 2.9. Detected at most once per run, and only
+        // when a repo with submodules needs it, so runs that never get there don't start `git --version`.
+        static readonly Lazy<Task<Version?>> GitVersion = new Lazy<Task<Version?>>(DetectGitVersionAsync);
+        static readonly Version MinGitVersionForSubmoduleJobs = new Version(2, 9);
+        static readonly Version MinGitVersionForSubmoduleSingleBranch = new Version(2, 26);
+
+        const string FullFetchArgs = "fetch --all --prune --tags --force";
+
+        // Max new refs per `git log --no-walk` call; keeps the command line well under Windows' length limit.
+        const int LogBatchSize = 32;
 
         // Some environments (CI/redirected output) don't support cursor operations.
         static bool SupportsCursorControl = true;
@@ -29,15 +64,21 @@ namespace GitPuller
         static int TotalRepos = 0;
         static int ProcessedCount = 0;
         static int SuccessCount = 0;
+        static int SkippedCount = 0;
         static int FailCount = 0;
         static int GlobalNewCommitsCount = 0;
 
+        // Shared separators/markers, built once instead of per call.
+        static readonly char[] LineSeparators = { '\r', '\n' };
+        static readonly char[] SpaceSeparator = { ' ' };
+        static readonly string SubmoduleGitDirMarker = Path.Combine(".git", "modules");
+
         // Tree characters
         const string TreeVert = "│ ";
         const string TreeBranch = "├─";
         const string TreeLast = "└─";
 
-        static int Main(string[] args)
+        static async Task<int> Main(string[] args)
         {
             // Force UTF-8
             Console.OutputEncoding = Encoding.UTF8;
@@ -64,63 +105,101 @@ namespace GitPuller
                 if (!ValidateAndNormalizeSettings())
                     return 1;
 
-                List<string> repos;
+                InitializeWorkers();
+
+                var results = new List<RepoResult>();
+                var sw = Stopwatch.StartNew();
+
+                List<RepoCacheEntry> repos;
                 if (!ForceRescan && TryLoadCache(out repos))
                 {
                     Console.WriteLine($"Loaded {repos.Count} repositories from cache.");
-                }
-                else
-                {
-                    Console.WriteLine($"Scanning {RootDir} for git repositories...");
-                    repos = FindGitRepos(RootDir);
-                    SaveCache(repos);
-                }
 
-                TotalRepos = repos.Count;
+                    TotalRepos = repos.Count;
 
-                if (TotalRepos == 0)
-                {
-                    Console.WriteLine("No repositories found.");
-                    return 0;
-                }
+                    if (TotalRepos == 0)
+                    {
+                        Console.WriteLine("No repositories found.");
+                        return 0;
+                    }
 
-                Console.WriteLine($"Found {TotalRepos} repositories. Processing with {MaxDegreeOfParallelism} workers...");
-                Console.WriteLine(); // Spacer
+                    Console.WriteLine($"Found {TotalRepos} repositories. Processing with {MaxDegreeOfParallelism} workers...");
+                    Console.WriteLine(); // Spacer
 
-                var results = new List<RepoResult>();
-                var options = new ParallelOptions { MaxDegreeOfParallelism = MaxDegreeOfParallelism };
-                var sw = Stopwatch.StartNew();
+                    // Initial Progress Bar
+                    DrawProgress();
 
-                // Initial Progress Bar
-                DrawProgress();
+                    // Stat each repo once here and carry the answer along, rather than checking again per worker.
+                    var work = repos.Select(entry => (Entry: entry, Fresh: IsFresh(entry))).ToList();
+                    if (work.All(w => w.Fresh) || TotalRepos == 1)
+                    {
+                        // Nothing to run concurrently: skip the worker pool and the writer thread.
+                        foreach (var (entry, fresh) in work)
+                        {
+                            WriteOutput(await RunEntryAsync(entry, fresh, results));
+                            DrawProgress();
+                        }
+                    }
+                    else
+                    {
+                        var queue = Channel.CreateUnbounded<(RepoCacheEntry Entry, bool Fresh)>();
+                        foreach (var item in work)
+                            queue.Writer.TryWrite(item);
+                        queue.Writer.Complete();
 
-                Parallel.ForEach(repos, options, (repo) =>
+                        await ProcessInParallelAsync(queue.Reader, results);
+                    }
+                }
+                else
                 {
-                    var res = ProcessRepo(repo);
-                    
-                    lock (ConsoleLock)
+                    // Start on each repo as soon as the scan finds it instead of after the whole walk.
+                    Console.WriteLine($"Scanning {RootDir} for git repositories (processing with {MaxDegreeOfParallelism} workers as they are found)...");
+                    Console.WriteLine(); // Spacer
+
+                    var discovered = new List<RepoCacheEntry>();
+                    var found = Channel.CreateUnbounded<(RepoCacheEntry Entry, bool Fresh)>();
+                    var scan = Task.Run(() =>
                     {
-                        ProcessedCount++;
-                        if (res.Failed) FailCount++;
-                        else SuccessCount++;
-                        
-                        GlobalNewCommitsCount += res.NewCommitsCount;
-
-                        results.Add(res);
-                        
-                        // Only print to main stream if there's something interesting (Error or New Commits)
-                        if (res.Failed || res.NewCommitsCount > 0)
+                        try
                         {
-                            ClearCurrentLine();
-                            PrintResult(res);
+                            FindGitRepos(RootDir, path =>
+                            {
+                                var entry = new RepoCacheEntry { Path = path };
+                                lock (discovered)
+                                {
+                                    discovered.Add(entry);
+                                }
+                                Interlocked.Increment(ref TotalRepos);
+                                found.Writer.TryWrite((entry, false)); // never pulled, so never fresh
+                            });
                         }
-                        
-                        DrawProgress();
+                        finally
+                        {
+                            found.Writer.Complete();
+                        }
+                    });
+
+                    await ProcessInParallelAsync(found.Reader, results);
+                    await scan;
+
+                    // Sort the path strings once and carry the entries along, rather than
+                    // dereferencing entries in every comparison.
+                    var entries = discovered.ToArray();
+                    var paths = entries.Select(e => e.Path).ToArray();
+                    Array.Sort(paths, entries, StringComparer.OrdinalIgnoreCase);
+                    repos = entries.ToList();
+
+                    if (TotalRepos == 0)
+                    {
+                        SaveCache(repos);
+                        Console.WriteLine("No repositories found.");
+                        return 0;
                     }
-                });
+                }
 
                 sw.Stop();
                 ClearCurrentLine(); // Clear final progress bar
+                SaveCache(repos);
                 WriteSummary(results, sw.Elapsed);
                 return 0;
             }
@@ -188,6 +267,32 @@ namespace GitPuller
                 {
                     PullFfOnly = false;
                 }
+                else if (args[i] == "--shallow")
+                {
+                    ShallowFetch = true;
+                }
+                else if (args[i] == "--low-priority")
+                {
+                    LowPriority = true;
+                }
+                else if (args[i] == "--fast-check")
+                {
+                    FastCheck = true;
+                }
+                else if (args[i] == "--submodule-jobs")
+                {
+                    if (!TryReadOptionValue(args, ref i, "--submodule-jobs", out var jobsRaw))
+                        continue;
+
+                    // 0 lets git pick a reasonable default.
+                    if (!int.TryParse(jobsRaw, out int jobs) || jobs < 0)
+                    {
+                        Console.WriteLine($"Warning: Invalid submodule job count '{jobsRaw}'. Keeping {SubmoduleJobs}.");
+                        continue;
+                    }
+
+                    SubmoduleJobs = jobs;
+                }
                 else if (args[i] == "--root")
                 {
                     if (!TryReadOptionValue(args, ref i, "--root", out var rootRaw))
@@ -195,6 +300,20 @@ namespace GitPuller
 
                     RootDir = rootRaw;
                 }
+                else if (args[i] == "--scan-depth")
+                {
+                    if (!TryReadOptionValue(args, ref i, "--scan-depth", out var depthRaw))
+                        continue;
+
+                    // 0 scans without a depth limit.
+                    if (!int.TryParse(depthRaw, out int depth) || depth < 0)
+                    {
+                        Console.WriteLine($"Warning: Invalid scan depth '{depthRaw}'. Keeping {MaxScanDepth}.");
+                        continue;
+                    }
+
+                    MaxScanDepth = depth;
+                }
                 else if (args[i] == "-t" || args[i] == "--timeout")
                 {
                     if (!TryReadOptionValue(args, ref i, args[i], out var timeoutRaw))
@@ -214,6 +333,20 @@ namespace GitPuller
 
                     GitTimeout = seconds * 1000;
                 }
+                else if (args[i] == "--min-interval")
+                {
+                    if (!TryReadOptionValue(args, ref i, "--min-interval", out var intervalRaw))
+                        continue;
+
+                    // 0 always runs git for every repo.
+                    if (!int.TryParse(intervalRaw, out int interval) || interval < 0)
+                    {
+                        Console.WriteLine($"Warning: Invalid minimum interval '{intervalRaw}'. Keeping {MinPullIntervalSeconds}s.");
+                        continue;
+                    }
+
+                    MinPullIntervalSeconds = interval;
+                }
                 else if (args[i] == "-h" || args[i] == "--help")
                 {
                     ShowHelp = true;
@@ -237,11 +370,17 @@ namespace GitPuller
             Console.WriteLine("  --rescan                    Ignore cache and rescan directories");
             Console.WriteLine("  --init-missing-submodules   Initialize missing submodules when updating");
             Console.WriteLine("  --no-init-submodules        Do not initialize new submodules");
+            Console.WriteLine($"  --submodule-jobs <number>   Parallel submodule fetches, 0 = git default (default: {DefaultSubmoduleJobs})");
             Console.WriteLine("  --no-pull                   Skip git pull (fetch/report only)");
+            Console.WriteLine("  --shallow                   Fetch only the upstream branch (no tags/other branches)");
+            Console.WriteLine("  --low-priority              Run this tool and all git processes at below-normal priority");
+            Console.WriteLine("  --fast-check                Skip repos whose branch already matches its upstream (git ls-remote)");
             Console.WriteLine("  --force-sync                Force sync to origin/HEAD (destructive)");
             Console.WriteLine("  --clean                     With --force-sync, remove untracked files (destructive)");
             Console.WriteLine("  --root <path>               Root directory to scan");
+            Console.WriteLine($"  --scan-depth <number>       Max directory depth to scan, 0 = unlimited (default: {DefaultMaxScanDepth})");
             Console.WriteLine($"  -t, --timeout <seconds>     Per-git-command timeout in seconds (default: {DefaultGitTimeoutSeconds})");
+            Console.WriteLine($"  --min-interval <seconds>    Skip repos pulled within this many seconds, 0 = never skip (default: {DefaultMinPullIntervalSeconds})");
             Console.WriteLine("  -h, --help                  Show this help and exit");
         }
 
@@ -279,6 +418,38 @@ namespace GitPuller
             return true;
         }
 
+        static void InitializeWorkers()
+        {
+            // Start with enough pool threads for every worker; otherwise the pool grows
+            // one thread at a time while the blocking directory scan holds the first ones.
+            ThreadPool.GetMinThreads(out int minWorkers, out int minIo);
+            if (minWorkers < MaxDegreeOfParallelism)
+                ThreadPool.SetMinThreads(MaxDegreeOfParallelism, minIo);
+
+            // Never prompt interactively in automation. Set on this process so every git child
+            // inherits it. On Windows this also spares each spawn a copied environment block,
+            // which touching ProcessStartInfo.Environment forces; Unix builds one regardless.
+            Environment.SetEnvironmentVariable("GIT_TERMINAL_PROMPT", "0");
+            Environment.SetEnvironmentVariable("GCM_INTERACTIVE", "never");
+
+            if (!LowPriority)
+                return;
+
+            // Set once here instead of per git process: children inherit the priority class
+            // (Windows) / nice value (Unix) of this process.
+            try
+            {
+                using (var self = Process.GetCurrentProcess())
+                {
+                    self.PriorityClass = ProcessPriorityClass.BelowNormal;
+                }
+            }
+            catch (Exception ex)
+            {
+                Console.WriteLine($"Warning: Failed to lower process priority: {ex.Message}");
+            }
+        }
+
         static bool TryReadOptionValue(string[] args, ref int index, string option, out string value)
         {
             value = string.Empty;
@@ -307,34 +478,88 @@ namespace GitPuller
             return arg == "-w"
                 || arg == "--init-missing-submodules"
                 || arg == "--no-init-submodules"
+                || arg == "--submodule-jobs"
                 || arg == "--rescan"
                 || arg == "--force-sync"
                 || arg == "--clean"
                 || arg == "--no-pull"
+                || arg == "--shallow"
+                || arg == "--low-priority"
+                || arg == "--fast-check"
                 || arg == "--root"
+                || arg == "--scan-depth"
                 || arg == "-t"
                 || arg == "--timeout"
+                || arg == "--min-interval"
                 || arg == "-h"
                 || arg == "--help";
         }
 
-        static bool TryLoadCache(out List<string> repos)
+        static readonly Regex GitVersionPattern = new Regex(@"(\d+)\.(\d+)(?:\.(\d+))?");
+
+        static async Task<Version?> DetectGitVersionAsync()
         {
-            repos = new List<string>();
+            // e.g. "git version 2.39.5" or "git version 2.43.0.windows.1"
+            var (rc, output) = await RunGitAsync(RootDir, "--version");
+            if (rc != 0)
+                return null;
+
+            var m = GitVersionPattern.Match(output);
+            if (!m.Success)
+                return null;
+
+            int patch = m.Groups[3].Success ? int.Parse(m.Groups[3].Value) : 0;
+            return new Version(int.Parse(m.Groups[1].Value), int.Parse(m.Groups[2].Value), patch);
+        }
+
+        static bool TryLoadCache(out List<RepoCacheEntry> repos)
+        {
+            repos = new List<RepoCacheEntry>();
             string cachePath = Path.Combine(RootDir, CacheFileName);
             if (!File.Exists(cachePath)) return false;
 
             try
             {
-                string json = File.ReadAllText(cachePath, Encoding.UTF8);
-                var cached = JsonSerializer.Deserialize<List<string>>(json);
-                if (cached == null) return false;
+                var cached = new List<RepoCacheEntry>();
+                long fingerprint;
+                using (var reader = new BinaryReader(File.OpenRead(cachePath), Encoding.UTF8))
+                {
+                    if (reader.ReadInt32() != CacheFormatVersion) return false;
+                    fingerprint = reader.ReadInt64();
 
-                // Verify paths exist
-                var valid = cached.Where(p => IsGitRepoRoot(p, out bool isSubmodule) && !isSubmodule).ToList();
-                if (valid.Count != cached.Count) return false; // Invalidate if any missing
+                    int count = reader.ReadInt32();
+                    for (int i = 0; i < count; i++)
+                    {
+                        var entry = new RepoCacheEntry { Path = reader.ReadString() };
+                        long lastPullTicks = reader.ReadInt64();
+                        entry.LastPullUtc = lastPullTicks == 0 ? null : new DateTime(lastPullTicks, DateTimeKind.Utc);
+                        entry.HeadWriteTicks = reader.ReadInt64();
+                        entry.PackedRefsWriteTicks = reader.ReadInt64();
+                        entry.FetchHeadWriteTicks = reader.ReadInt64();
+                        entry.HeadLogWriteTicks = reader.ReadInt64();
+                        cached.Add(entry);
+                    }
+                }
 
-                repos = valid;
+                if (fingerprint == StaleFingerprint || cached.Count == 0) return false;
+
+                // The root hasn't changed since the cache was written: trust it without
+                // touching every repo. A repo moved deeper down fails once in this run and
+                // marks the cache stale, so the next run rescans.
+                if (fingerprint == GetRootFingerprint())
+                {
+                    repos = cached;
+                    return true;
+                }
+
+                // Verify paths exist; if any repo is gone it may have moved, so rescan.
+                foreach (var entry in cached)
+                {
+                    if (!IsGitRepoRoot(entry.Path, out bool isSubmodule) || isSubmodule)
+                        return false;
+                }
+
+                repos = cached;
                 return true;
             }
             catch
@@ -343,13 +568,44 @@ namespace GitPuller
             }
         }
 
-        static void SaveCache(List<string> repos)
+        static void SaveCache(List<RepoCacheEntry> repos)
         {
             try
             {
                 string cachePath = Path.Combine(RootDir, CacheFileName);
-                string json = JsonSerializer.Serialize(repos, new JsonSerializerOptions { WriteIndented = true });
-                File.WriteAllText(cachePath, json, Encoding.UTF8);
+
+                byte[] data;
+                using (var buffer = new MemoryStream())
+                {
+                    using (var writer = new BinaryWriter(buffer, Encoding.UTF8, leaveOpen: true))
+                    {
+                        writer.Write(CacheFormatVersion);
+                        writer.Write(CacheStale ? StaleFingerprint : GetRootFingerprint());
+                        writer.Write(repos.Count);
+                        foreach (var entry in repos)
+                        {
+                            writer.Write(entry.Path);
+                            writer.Write(entry.LastPullUtc?.Ticks ?? 0L);
+                            writer.Write(entry.HeadWriteTicks);
+                            writer.Write(entry.PackedRefsWriteTicks);
+                            writer.Write(entry.FetchHeadWriteTicks);
+                            writer.Write(entry.HeadLogWriteTicks);
+                        }
+                    }
+                    data = buffer.ToArray();
+                }
+
+                // Unchanged (e.g. every repo was skipped as fresh): leave the file alone.
+                if (File.Exists(cachePath) && File.ReadAllBytes(cachePath).AsSpan().SequenceEqual(data))
+                    return;
+
+                // Write next to the target and swap it in, so an interrupted run never leaves a torn cache.
+                string tempPath = cachePath + ".tmp";
+                File.WriteAllBytes(tempPath, data);
+                File.Move(tempPath, cachePath, overwrite: true);
+
+                // Superseded by the binary cache.
+                File.Delete(Path.Combine(RootDir, LegacyCacheFileName));
             }
             catch (Exception ex)
             {
@@ -357,6 +613,56 @@ namespace GitPuller
             }
         }
 
+        static long GetRootFingerprint()
+        {
+            // Hash of the root's subdirectory names: changes whenever one is added, removed or
+            // renamed. (The root's mtime can't be used: writing the cache file itself bumps it.)
+            var names = Directory.EnumerateDirectories(RootDir).Select(Path.GetFileName).ToList();
+            names.Sort(StringComparer.Ordinal);
+            var hash = SHA256.HashData(Encoding.UTF8.GetBytes(string.Join("\n", names)));
+            return BitConverter.ToInt64(hash, 0);
+        }
+
+        static bool IsFresh(RepoCacheEntry entry)
+        {
+            if (MinPullIntervalSeconds == 0 || ForceSync || entry.LastPullUtc == null)
+                return false;
+
+            if (DateTime.UtcNow - entry.LastPullUtc.Value >= TimeSpan.FromSeconds(MinPullIntervalSeconds))
+                return false;
+
+            // A checkout rewrites HEAD, gc repacks packed-refs, a manual fetch writes FETCH_HEAD, and
+            // commits, merges and resets append to logs/HEAD; any of them forces a real pull.
+            var gitDir = Path.Combine(entry.Path, ".git");
+            return File.GetLastWriteTimeUtc(Path.Combine(gitDir, "HEAD")).Ticks == entry.HeadWriteTicks
+                && File.GetLastWriteTimeUtc(Path.Combine(gitDir, "packed-refs")).Ticks == entry.PackedRefsWriteTicks
+                && File.GetLastWriteTimeUtc(Path.Combine(gitDir, "FETCH_HEAD")).Ticks == entry.FetchHeadWriteTicks
+                && File.GetLastWriteTimeUtc(Path.Combine(gitDir, "logs", "HEAD")).Ticks == entry.HeadLogWriteTicks;
+        }
+
+        static void RecordPull(RepoCacheEntry entry, RepoResult result)
+        {
+            // A failed repo wasn't fresh going in, so its entry stays as it was; that way a run where
+            // only a few repos failed (e.g. the network dropped) leaves the cache file untouched.
+            if (result.Failed)
+                return;
+
+            // Only a plain `.git` directory has these files at known paths; worktrees are always pulled.
+            // A --no-pull run only fetched, so it must not make the next run skip the fast-forward.
+            var gitDir = Path.Combine(entry.Path, ".git");
+            if (!PullFfOnly || !Directory.Exists(gitDir))
+            {
+                entry.LastPullUtc = null;
+                return;
+            }
+
+            entry.LastPullUtc = DateTime.UtcNow;
+            entry.HeadWriteTicks = File.GetLastWriteTimeUtc(Path.Combine(gitDir, "HEAD")).Ticks;
+            entry.PackedRefsWriteTicks = File.GetLastWriteTimeUtc(Path.Combine(gitDir, "packed-refs")).Ticks;
+            entry.FetchHeadWriteTicks = File.GetLastWriteTimeUtc(Path.Combine(gitDir, "FETCH_HEAD")).Ticks;
+            entry.HeadLogWriteTicks = File.GetLastWriteTimeUtc(Path.Combine(gitDir, "logs", "HEAD")).Ticks;
+        }
+
         static void DrawProgress()
         {
             if (TotalRepos == 0) return;
@@ -403,50 +709,114 @@ namespace GitPuller
             }
         }
 
-        static List<string> FindGitRepos(string root)
+        // Directory.EnumerateDirectories(path) defaults: include hidden/system entries (e.g. `.git` on Windows).
+        static readonly EnumerationOptions ScanEnumerationOptions = new EnumerationOptions
+        {
+            AttributesToSkip = 0,
+            IgnoreInaccessible = true,
+            RecurseSubdirectories = false
+        };
+
+        // `onFound` is called (from scan threads, possibly concurrently) for each repo discovered.
+        static void FindGitRepos(string root, Action<string> onFound)
         {
             // Walk the directory tree while:
             // - skipping known noisy build folders
             // - stopping recursion once we hit a repo root (don't scan inside repos)
             // - never scanning inside any `.git` directory
-            var repos = new List<string>();
-            var pending = new Stack<string>();
-            pending.Push(root);
+            // - not following symlinks/junctions, and stopping at MaxScanDepth (0 = unlimited)
+            var rootName = Path.GetFileName(root.TrimEnd(Path.DirectorySeparatorChar, Path.AltDirectorySeparatorChar));
+            if (IsIgnoredDirName(rootName))
+                return;
 
-            while (pending.Count > 0)
+            var topLevel = new List<string>();
+            if (ScanDirectory(root, topLevel))
             {
-                var dir = pending.Pop();
-                var name = Path.GetFileName(dir.TrimEnd(Path.DirectorySeparatorChar, Path.AltDirectorySeparatorChar));
+                onFound(root);
+                return;
+            }
 
-                if (IsIgnoredDirName(name))
-                    continue;
+            // Top-level subtrees are independent, and directory reads are latency-bound
+            // (especially on network drives), so walk them concurrently.
+            var options = new ParallelOptions { MaxDegreeOfParallelism = MaxDegreeOfParallelism };
+            Parallel.ForEach(topLevel, options, dir => WalkRepos(dir, 1, onFound));
+        }
+
+        static void WalkRepos(string start, int startDepth, Action<string> onFound)
+        {
+            var pending = new Stack<(string Dir, int Depth)>();
+            pending.Push((start, startDepth));
 
-                if (IsGitRepoRoot(dir, out bool isSubmoduleRepo) && !isSubmoduleRepo)
+            var children = new List<string>();
+            while (pending.Count > 0)
+            {
+                var (dir, depth) = pending.Pop();
+
+                children.Clear();
+                if (ScanDirectory(dir, children))
                 {
-                    repos.Add(dir);
+                    onFound(dir);
                     continue; // Don't recurse into a repo
                 }
 
-                try
+                if (MaxScanDepth > 0 && depth >= MaxScanDepth)
+                    continue;
+
+                foreach (var child in children)
+                    pending.Push((child, depth + 1));
+            }
+        }
+
+        // Returns true if `dir` is a (non-submodule) repo root; otherwise fills `children`
+        // with the subdirectories worth descending into.
+        static bool ScanDirectory(string dir, List<string> children)
+        {
+            // Read each directory once: the entry type comes with the listing itself, so finding
+            // `.git` and picking subdirectories needs no extra stat calls per directory.
+            string? gitEntryPath = null;
+            bool gitEntryIsDirectory = false;
+            try
+            {
+                var entries = new FileSystemEnumerable<(string Path, bool IsDirectory, bool IsGit, bool IsReparsePoint)>(
+                    dir,
+                    (ref FileSystemEntry e) => (
+                        e.ToFullPath(),
+                        e.IsDirectory,
+                        e.FileName.Equals(".git".AsSpan(), StringComparison.OrdinalIgnoreCase),
+                        (e.Attributes & FileAttributes.ReparsePoint) != 0),
+                    ScanEnumerationOptions)
+                {
+                    ShouldIncludePredicate = (ref FileSystemEntry e) =>
+                        e.IsDirectory || e.FileName.Equals(".git".AsSpan(), StringComparison.OrdinalIgnoreCase)
+                };
+
+                foreach (var entry in entries)
                 {
-                    foreach (var child in Directory.EnumerateDirectories(dir))
+                    if (entry.IsGit)
                     {
-                        var childName = Path.GetFileName(child);
-                        if (childName.Equals(".git", StringComparison.OrdinalIgnoreCase))
-                            continue;
-                        if (IsIgnoredDirName(childName))
-                            continue;
-                        pending.Push(child);
+                        gitEntryPath = entry.Path;
+                        gitEntryIsDirectory = entry.IsDirectory;
+                        continue;
                     }
+                    if (entry.IsReparsePoint)
+                        continue;
+                    if (IsIgnoredDirName(Path.GetFileName(entry.Path)))
+                        continue;
+                    children.Add(entry.Path);
                 }
-                catch
-                {
-                    // Ignore access/IO issues and continue scanning.
-                }
             }
+            catch
+            {
+                // Ignore access/IO issues and continue scanning.
+            }
+
+            if (gitEntryPath == null)
+                return false;
+
+            if (gitEntryIsDirectory)
+                return true;
 
-            repos.Sort(StringComparer.OrdinalIgnoreCase);
-            return repos;
+            return TryReadGitFile(gitEntryPath, out bool isSubmoduleRepo) && !isSubmoduleRepo;
         }
 
         static bool IsIgnoredDirName(string? name)
@@ -465,18 +835,32 @@ namespace GitPuller
             isSubmoduleWorkingTree = false;
             if (string.IsNullOrWhiteSpace(path)) return false;
 
+            // A single stat tells both whether `.git` exists and whether it is a directory.
             var gitPath = Path.Combine(path, ".git");
-            if (Directory.Exists(gitPath))
+            FileAttributes attributes;
+            try
+            {
+                attributes = File.GetAttributes(gitPath);
+            }
+            catch
+            {
+                return false; // missing or inaccessible
+            }
+
+            if ((attributes & FileAttributes.Directory) != 0)
                 return true;
 
             // Worktrees and submodules often use a `.git` *file* with a `gitdir:` pointer.
-            if (!File.Exists(gitPath))
-                return false;
+            return TryReadGitFile(gitPath, out isSubmoduleWorkingTree);
+        }
 
+        static bool TryReadGitFile(string gitPath, out bool isSubmoduleWorkingTree)
+        {
+            isSubmoduleWorkingTree = false;
             try
             {
                 var text = File.ReadAllText(gitPath, Encoding.UTF8);
-                var firstLine = text.Split(new[] { '\r', '\n' }, StringSplitOptions.RemoveEmptyEntries).FirstOrDefault();
+                var firstLine = text.Split(LineSeparators, StringSplitOptions.RemoveEmptyEntries).FirstOrDefault();
                 if (firstLine == null) return false;
 
                 const string prefix = "gitdir:";
@@ -488,8 +872,7 @@ namespace GitPuller
                 var gitdir = firstLine.Substring(firstLine.IndexOf(':') + 1).Trim();
                 var normalized = gitdir.Replace('/', Path.DirectorySeparatorChar);
 
-                var marker = string.Join(Path.DirectorySeparatorChar.ToString(), new[] { ".git", "modules" });
-                if (normalized.IndexOf(marker, StringComparison.OrdinalIgnoreCase) >= 0)
+                if (normalized.IndexOf(SubmoduleGitDirMarker, StringComparison.OrdinalIgnoreCase) >= 0)
                     isSubmoduleWorkingTree = true;
 
                 return true;
@@ -500,7 +883,7 @@ namespace GitPuller
             }
         }
 
-        static RepoResult ProcessRepo(string repoPath)
+        static async Task<RepoResult> ProcessRepoAsync(string repoPath)
         {
             var result = new RepoResult { Path = repoPath, Name = Path.GetFileName(repoPath) };
 
@@ -508,29 +891,41 @@ namespace GitPuller
             {
                 result.Failed = true;
                 result.Logs.Add(new LogItem { Text = "Not a supported git repository.", IsError = true });
+                CacheStale = true;
+                return result;
+            }
+
+            var upstream = ShallowFetch || FastCheck ? await GetUpstreamAsync(repoPath) : null;
+
+            // One ls-remote round trip instead of a full fetch negotiation when nothing changed upstream.
+            // Note: this also skips reporting other branches and updating submodules.
+            if (FastCheck && !ForceSync && upstream != null && await IsUpToDateWithUpstreamAsync(repoPath, upstream.Value))
+            {
+                result.Skipped = true;
                 return result;
             }
 
-            var beforeRefs = GetRemoteRefs(repoPath);
+            var beforeRefs = await GetRemoteRefsAsync(repoPath);
             
             // Retry logic for fetch
             int retries = 3;
             int rc = -1;
             string outText = "";
+            var fetchArgs = ShallowFetch && upstream != null ? BuildUpstreamFetchArgs(upstream.Value) : FullFetchArgs;
             
             while (retries > 0)
             {
-                (rc, outText) = RunGitWithSshToHttpsFallback(repoPath, "fetch --all --prune --tags --force");
+                (rc, outText) = await RunGitWithSshToHttpsFallbackAsync(repoPath, fetchArgs);
                 if (rc == 0) break;
                 
                 // If failed, try to prune explicit remote first to clear bad refs
                 if (retries < 3) // Don't do it strictly on first attempt if we want, but valid to do it if failed
                 {
-                     RunGitWithSshToHttpsFallback(repoPath, "remote prune origin");
+                     await RunGitWithSshToHttpsFallbackAsync(repoPath, "remote prune origin");
                 }
 
                 retries--;
-                if (retries > 0) Thread.Sleep(1000); // Backoff
+                if (retries > 0) await Task.Delay(1000); // Backoff
             }
             
             if (rc != 0)
@@ -540,8 +935,10 @@ namespace GitPuller
                 return result;
             }
 
-            var afterRefs = GetRemoteRefs(repoPath);
+            var afterRefs = await GetRemoteRefsAsync(repoPath);
             var seenCommits = new HashSet<string>();
+            var newTips = new List<string>();
+            var updatedRanges = new List<(string Old, string New)>();
 
             foreach (var kvp in afterRefs)
             {
@@ -554,34 +951,59 @@ namespace GitPuller
                 if (!beforeRefs.TryGetValue(refName, out var oldSha))
                 {
                     // New branch
-                    var (rcLog, logOut) = RunGit(repoPath, $"log -1 --format=\"%h %s (%an)\" {newSha}");
-                    if (rcLog == 0 && !string.IsNullOrWhiteSpace(logOut))
-                    {
-                        ParseAndAddCommits(result, logOut, seenCommits);
-                    }
+                    newTips.Add(newSha);
                 }
                 else if (oldSha != newSha)
                 {
                     // Updated branch
-                    var (rcLog, logOut) = RunGit(repoPath, $"log --format=\"%h %s (%an)\" {oldSha}..{newSha}");
-                    if (rcLog == 0 && !string.IsNullOrWhiteSpace(logOut))
-                    {
-                        ParseAndAddCommits(result, logOut, seenCommits);
-                    }
+                    updatedRanges.Add((oldSha, newSha));
+                }
+            }
+
+            // One `git log` per batch of new refs instead of one per ref; a batch that fails
+            // (e.g. a tip no longer exists locally) is retried ref by ref.
+            foreach (var batch in newTips.Chunk(LogBatchSize))
+            {
+                if (await TryAddCommitLogAsync(repoPath, result, seenCommits, $"--no-walk {string.Join(" ", batch)}"))
+                    continue;
+
+                foreach (var newSha in batch)
+                    await TryAddCommitLogAsync(repoPath, result, seenCommits, $"-1 {newSha}");
+            }
+
+            // All updated refs in one `git log`: commits reachable from a new tip but from none of
+            // the previous tips, i.e. commits that are new to the remote-tracking refs as a whole.
+            // Revisions go through stdin, so no command-line limit applies. If it fails (e.g. an
+            // old tip no longer exists locally), fall back to the per-ref `old..new` ranges.
+            if (updatedRanges.Count > 0)
+            {
+                var revisions = new StringBuilder();
+                foreach (var (_, newSha) in updatedRanges)
+                    revisions.Append(newSha).Append('\n');
+                foreach (var (oldSha, _) in updatedRanges)
+                    revisions.Append('^').Append(oldSha).Append('\n');
+
+                if (!await TryAddCommitLogAsync(repoPath, result, seenCommits, "--stdin", revisions.ToString()))
+                {
+                    foreach (var (oldSha, newSha) in updatedRanges)
+                        await TryAddCommitLogAsync(repoPath, result, seenCommits, $"{oldSha}..{newSha}");
                 }
             }
 
             // Update the checked-out branch/worktree.
             if (PullFfOnly)
             {
-                TrySyncWorkingTree(repoPath, result);
+                await TrySyncWorkingTreeAsync(repoPath, result);
             }
 
             // Submodules: keep superproject-recorded SHAs in sync.
             // Note: this does *not* treat submodules as separate repos for scanning; it updates them via the parent.
-            TryUpdateSubmodules(repoPath, result);
+            await TryUpdateSubmodulesAsync(repoPath, result);
 
-            var (rcMod, outMod) = RunGit(repoPath, "submodule status --recursive");
+            if (!File.Exists(Path.Combine(repoPath, ".gitmodules")))
+                return result; // nothing for `submodule status` to report
+
+            var (rcMod, outMod) = await RunGitAsync(repoPath, "submodule status --recursive");
             if (rcMod == 0)
             {
                 using (var reader = new StringReader(outMod))
@@ -604,12 +1026,12 @@ namespace GitPuller
             return result;
         }
 
-        static void TrySyncWorkingTree(string repoPath, RepoResult result)
+        static async Task TrySyncWorkingTreeAsync(string repoPath, RepoResult result)
         {
             if (ForceSync)
             {
                 // Best-effort: reset the default branch (origin/HEAD) to match remote.
-                var (rcHead, outHead) = RunGit(repoPath, "symbolic-ref -q --short refs/remotes/origin/HEAD");
+                var (rcHead, outHead) = await RunGitAsync(repoPath, "symbolic-ref -q --short refs/remotes/origin/HEAD");
                 if (rcHead != 0 || string.IsNullOrWhiteSpace(outHead))
                 {
                     result.Failed = true;
@@ -626,7 +1048,7 @@ namespace GitPuller
                 if (CleanUntracked)
                 {
                     // Clean first to avoid checkout failure due to untracked files.
-                    var (rcCleanPre, outCleanPre) = RunGit(repoPath, "clean -fdx");
+                    var (rcCleanPre, outCleanPre) = await RunGitAsync(repoPath, "clean -fdx");
                     if (rcCleanPre != 0)
                     {
                         result.Logs.Add(new LogItem { Text = $"git clean failed:\n{outCleanPre}", IsWarning = true });
@@ -634,7 +1056,7 @@ namespace GitPuller
                 }
 
                 // checkout -B works across older git versions
-                var (rcCo, outCo) = RunGit(repoPath, $"checkout -f -B {branchName} {remoteRef}");
+                var (rcCo, outCo) = await RunGitAsync(repoPath, $"checkout -f -B {branchName} {remoteRef}");
                 if (rcCo != 0)
                 {
                     result.Failed = true;
@@ -642,7 +1064,7 @@ namespace GitPuller
                     return;
                 }
 
-                var (rcReset, outReset) = RunGit(repoPath, $"reset --hard {remoteRef}");
+                var (rcReset, outReset) = await RunGitAsync(repoPath, $"reset --hard {remoteRef}");
                 if (rcReset != 0)
                 {
                     result.Failed = true;
@@ -652,7 +1074,7 @@ namespace GitPuller
 
                 if (CleanUntracked)
                 {
-                    var (rcClean, outClean) = RunGit(repoPath, "clean -fdx");
+                    var (rcClean, outClean) = await RunGitAsync(repoPath, "clean -fdx");
                     if (rcClean != 0)
                     {
                         result.Logs.Add(new LogItem { Text = $"git clean failed:\n{outClean}", IsWarning = true });
@@ -663,7 +1085,10 @@ namespace GitPuller
             }
 
             // Safe mode: fast-forward only (no merges, no resets).
-            var (rcPull, outPull) = RunGitWithSshToHttpsFallback(repoPath, "pull --ff-only --recurse-submodules=no");
+            // With --shallow the upstream was already fetched above, so skip pull's second round trip.
+            var (rcPull, outPull) = ShallowFetch
+                ? await RunGitAsync(repoPath, "merge --ff-only @{u}")
+                : await RunGitWithSshToHttpsFallbackAsync(repoPath, "pull --ff-only --recurse-submodules=no");
             if (rcPull != 0)
             {
                 result.Failed = true;
@@ -671,13 +1096,13 @@ namespace GitPuller
             }
         }
 
-        static void TryUpdateSubmodules(string repoPath, RepoResult result)
+        static async Task TryUpdateSubmodulesAsync(string repoPath, RepoResult result)
         {
             if (!File.Exists(Path.Combine(repoPath, ".gitmodules")))
                 return;
 
             // Keep URLs consistent with .gitmodules
-            var (rcSync, outSync) = RunGit(repoPath, "submodule sync --recursive");
+            var (rcSync, outSync) = await RunGitAsync(repoPath, "submodule sync --recursive");
             if (rcSync != 0)
             {
                 result.Logs.Add(new LogItem { Text = $"Submodule sync failed:\n{outSync}", IsWarning = true });
@@ -690,7 +1115,16 @@ namespace GitPuller
             if (ForceSync)
                 args += " --force";
 
-            var (rcSub, outSub) = RunGitWithSshToHttpsFallback(repoPath, args);
+            // Let git fetch/clone submodules in parallel instead of one at a time.
+            var gitVersion = await GitVersion.Value;
+            if (gitVersion != null && gitVersion >= MinGitVersionForSubmoduleJobs)
+                args += $" --jobs {SubmoduleJobs}";
+
+            // Newly cloned submodules only need the branch they are checked out from.
+            if (ShallowFetch && gitVersion != null && gitVersion >= MinGitVersionForSubmoduleSingleBranch)
+                args += " --single-branch";
+
+            var (rcSub, outSub) = await RunGitWithSshToHttpsFallbackAsync(repoPath, args);
             if (rcSub != 0)
             {
                 result.Failed = true;
@@ -699,12 +1133,12 @@ namespace GitPuller
             }
 
             // Fetch submodule remotes to keep their remote-tracking refs up to date too.
-            TryFetchSubmoduleRemotes(repoPath, result);
+            await TryFetchSubmoduleRemotesAsync(repoPath, result);
         }
 
-        static void TryFetchSubmoduleRemotes(string repoPath, RepoResult result)
+        static async Task TryFetchSubmoduleRemotesAsync(string repoPath, RepoResult result)
         {
-            var (rc, output) = RunGit(repoPath, "submodule status --recursive");
+            var (rc, output) = await RunGitAsync(repoPath, "submodule status --recursive");
             if (rc != 0 || string.IsNullOrWhiteSpace(output))
                 return;
 
@@ -714,7 +1148,7 @@ namespace GitPuller
                 string? line;
                 while ((line = reader.ReadLine()) != null)
                 {
-                    var parts = line.Trim().Split(new[] { ' ' }, StringSplitOptions.RemoveEmptyEntries);
+                    var parts = line.Trim().Split(SpaceSeparator, StringSplitOptions.RemoveEmptyEntries);
                     if (parts.Length < 2) continue;
 
                     // First token begins with status prefix (+/-/U/space) attached to the SHA.
@@ -729,7 +1163,8 @@ namespace GitPuller
                     if (!Directory.Exists(subPath))
                         continue;
 
-                    var (rcFetch, outFetch) = RunGitWithSshToHttpsFallback(subPath, "fetch --all --prune --tags --force");
+                    var subFetchArgs = ShallowFetch ? "fetch --prune --no-tags" : FullFetchArgs;
+                    var (rcFetch, outFetch) = await RunGitWithSshToHttpsFallbackAsync(subPath, subFetchArgs);
                     if (rcFetch != 0)
                     {
                         result.Logs.Add(new LogItem { Text = $"Submodule fetch failed ({relPath}):\n{outFetch}", IsWarning = true });
@@ -737,7 +1172,7 @@ namespace GitPuller
 
                     if (ForceSync && CleanUntracked)
                     {
-                        var (rcClean, outClean) = RunGit(subPath, "clean -fdx");
+                        var (rcClean, outClean) = await RunGitAsync(subPath, "clean -fdx");
                         if (rcClean != 0)
                         {
                             result.Logs.Add(new LogItem { Text = $"Submodule clean failed ({relPath}):\n{outClean}", IsWarning = true });
@@ -747,12 +1182,69 @@ namespace GitPuller
             }
         }
 
+        static async Task<(string LocalSha, string Remote, string RemoteRef)?> GetUpstreamAsync(string repoPath)
+        {
+            var (rcHead, outHead) = await RunGitAsync(repoPath, "symbolic-ref -q HEAD");
+            if (rcHead != 0 || string.IsNullOrWhiteSpace(outHead))
+                return null; // detached HEAD
+
+            var (rcUp, outUp) = await RunGitAsync(repoPath, $"for-each-ref --format=\"%(objectname) %(upstream:remotename) %(upstream:remoteref)\" {outHead.Trim()}");
+            if (rcUp != 0)
+                return null;
+
+            // outUp is like: <sha> origin refs/heads/main
+            var parts = outUp.Trim().Split(SpaceSeparator, StringSplitOptions.RemoveEmptyEntries);
+            if (parts.Length != 3)
+                return null; // no upstream configured
+
+            return (parts[0], parts[1], parts[2]);
+        }
+
+        static string BuildUpstreamFetchArgs((string LocalSha, string Remote, string RemoteRef) upstream)
+        {
+            // Fetch only the branch the current branch tracks, instead of every remote ref and tag.
+            // The configured remote-tracking ref (e.g. origin/main) is updated opportunistically.
+            return $"-c fetch.recurseSubmodules=false fetch --prune --no-tags {upstream.Remote} {upstream.RemoteRef}";
+        }
+
+        static async Task<bool> IsUpToDateWithUpstreamAsync(string repoPath, (string LocalSha, string Remote, string RemoteRef) upstream)
+        {
+            var (rc, output) = await RunGitWithSshToHttpsFallbackAsync(repoPath, $"ls-remote {upstream.Remote} {upstream.RemoteRef}");
+            if (rc != 0)
+                return false; // let the regular fetch report the problem
+
+            // Lines are like: <sha>\trefs/heads/main
+            using (var reader = new StringReader(output))
+            {
+                string? line;
+                while ((line = reader.ReadLine()) != null)
+                {
+                    var parts = line.Split('\t');
+                    if (parts.Length == 2 && parts[1].Trim() == upstream.RemoteRef)
+                        return parts[0].Trim() == upstream.LocalSha;
+                }
+            }
+
+            return false;
+        }
+
+        static async Task<bool> TryAddCommitLogAsync(string repoPath, RepoResult result, HashSet<string> seenCommits, string revisions, string? stdin = null)
+        {
+            var (rcLog, logOut) = await RunGitAsync(repoPath, $"log --format=\"%h %s (%an)\" {revisions}", stdin);
+            if (rcLog != 0)
+                return false;
+
+            if (!string.IsNullOrWhiteSpace(logOut))
+                ParseAndAddCommits(result, logOut, seenCommits);
+            return true;
+        }
+
         static void ParseAndAddCommits(RepoResult result, string logOutput, HashSet<string> seenCommits)
         {
-            var lines = logOutput.Split(new[] { '\r', '\n' }, StringSplitOptions.RemoveEmptyEntries);
+            var lines = logOutput.Split(LineSeparators, StringSplitOptions.RemoveEmptyEntries);
             foreach (var line in lines)
             {
-                var parts = line.Split(new[] { ' ' }, 2);
+                var parts = line.Split(SpaceSeparator, 2);
                 if (parts.Length < 2) continue;
 
                 var hash = parts[0];
@@ -767,10 +1259,20 @@ namespace GitPuller
             }
         }
 
-        static Dictionary<string, string> GetRemoteRefs(string repoPath)
+        static async Task<Dictionary<string, string>> GetRemoteRefsAsync(string repoPath)
         {
+            // Reading the ref store directly saves a git process before and after every fetch.
+            // Worktrees (`.git` file) and the reftable backend go through git instead.
+            var gitDir = Path.Combine(repoPath, ".git");
+            if (Directory.Exists(gitDir) && !Directory.Exists(Path.Combine(gitDir, "reftable")))
+            {
+                var direct = TryReadRemoteRefs(gitDir);
+                if (direct != null)
+                    return direct;
+            }
+
             var refs = new Dictionary<string, string>();
-            var (rc, output) = RunGit(repoPath, "for-each-ref --format=\"%(refname) %(objectname)\" refs/remotes");
+            var (rc, output) = await RunGitAsync(repoPath, "for-each-ref --format=\"%(refname) %(objectname)\" refs/remotes");
             if (rc == 0)
             {
                 using (var reader = new StringReader(output))
@@ -786,7 +1288,64 @@ namespace GitPuller
             return refs;
         }
 
-        static (int, string) RunGit(string cwd, string args)
+        static readonly Regex ObjectIdPattern = new Regex("^[0-9a-f]{40}([0-9a-f]{24})?$");
+
+        static Dictionary<string, string>? TryReadRemoteRefs(string gitDir)
+        {
+            try
+            {
+                var refs = new Dictionary<string, string>();
+
+                var packedPath = Path.Combine(gitDir, "packed-refs");
+                if (File.Exists(packedPath))
+                {
+                    foreach (var line in File.ReadLines(packedPath))
+                    {
+                        // Skip the `# pack-refs with:` header and peeled-tag `^<sha>` lines.
+                        if (line.Length == 0 || line[0] == '#' || line[0] == '^')
+                            continue;
+
+                        var sep = line.IndexOf(' ');
+                        if (sep <= 0)
+                            continue;
+
+                        var name = line.Substring(sep + 1);
+                        if (name.StartsWith("refs/remotes/", StringComparison.Ordinal))
+                            refs[name] = line.Substring(0, sep);
+                    }
+                }
+
+                // Loose refs take precedence over packed ones.
+                var looseRoot = Path.Combine(gitDir, "refs", "remotes");
+                if (Directory.Exists(looseRoot))
+                {
+                    foreach (var file in Directory.EnumerateFiles(looseRoot, "*", SearchOption.AllDirectories))
+                    {
+                        if (file.EndsWith(".lock", StringComparison.OrdinalIgnoreCase))
+                            continue;
+
+                        var value = File.ReadAllText(file).Trim();
+                        if (value.StartsWith("ref:", StringComparison.Ordinal))
+                            continue; // symbolic (origin/HEAD); callers ignore HEAD refs anyway
+
+                        var name = Path.GetRelativePath(gitDir, file).Replace(Path.DirectorySeparatorChar, '/');
+                        refs[name] = value;
+                    }
+                }
+
+                // Anything that doesn't look like an object id means a layout we don't understand.
+                if (refs.Values.Any(sha => !ObjectIdPattern.IsMatch(sha)))
+                    return null;
+
+                return refs;
+            }
+            catch
+            {
+                return null;
+            }
+        }
+
+        static async Task<(int, string)> RunGitAsync(string cwd, string args, string? stdin = null)
         {
             try
             {
@@ -795,6 +1354,7 @@ namespace GitPuller
                     FileName = "git",
                     Arguments = args,
                     WorkingDirectory = cwd,
+                    RedirectStandardInput = stdin != null,
                     RedirectStandardOutput = true,
                     RedirectStandardError = true,
                     UseShellExecute = false,
@@ -803,26 +1363,34 @@ namespace GitPuller
                     StandardErrorEncoding = Encoding.UTF8
                 };
 
-                // Never prompt interactively in automation.
-                psi.Environment["GIT_TERMINAL_PROMPT"] = "0";
-                psi.Environment["GCM_INTERACTIVE"] = "never";
-
                 var p = Process.Start(psi);
                 if (p == null)
                     return (-1, "Failed to start git process.");
 
                 using (p)
+                using (var cts = new CancellationTokenSource(GitTimeout))
                 {
                     var stdout = p.StandardOutput.ReadToEndAsync();
                     var stderr = p.StandardError.ReadToEndAsync();
+
+                    if (stdin != null)
+                    {
+                        // Output is already being drained above, so a large input can't deadlock.
+                        await p.StandardInput.WriteAsync(stdin);
+                        p.StandardInput.Close();
+                    }
                     
-                    if (!p.WaitForExit(GitTimeout))
+                    try
+                    {
+                        await p.WaitForExitAsync(cts.Token);
+                    }
+                    catch (OperationCanceledException)
                     {
                         try { p.Kill(); } catch { }
                         return (-1, $"Timeout ({GitTimeout/1000}s)");
                     }
 
-                    Task.WaitAll(stdout, stderr);
+                    await Task.WhenAll(stdout, stderr);
                     return (p.ExitCode, (stdout.Result + "\n" + stderr.Result).Trim());
                 }
             }
@@ -832,9 +1400,9 @@ namespace GitPuller
             }
         }
 
-        static (int, string) RunGitWithSshToHttpsFallback(string cwd, string args)
+        static async Task<(int, string)> RunGitWithSshToHttpsFallbackAsync(string cwd, string args)
         {
-            var (rc, output) = RunGit(cwd, args);
+            var (rc, output) = await RunGitAsync(cwd, args);
             if (rc == 0)
                 return (rc, output);
 
@@ -844,7 +1412,7 @@ namespace GitPuller
             var hosts = ExtractHostsFromText(output);
             if (hosts.Count == 0)
             {
-                var (rcRemotes, outRemotes) = RunGit(cwd, "remote -v");
+                var (rcRemotes, outRemotes) = await RunGitAsync(cwd, "remote -v");
                 if (rcRemotes == 0 && !string.IsNullOrWhiteSpace(outRemotes))
                     hosts = ExtractHostsFromText(outRemotes);
             }
@@ -856,7 +1424,7 @@ namespace GitPuller
             if (string.IsNullOrWhiteSpace(rewritePrefix))
                 return (rc, output);
 
-            var (rc2, output2) = RunGit(cwd, $"{rewritePrefix} {args}");
+            var (rc2, output2) = await RunGitAsync(cwd, $"{rewritePrefix} {args}");
             if (rc2 == 0)
                 return (rc2, output2);
 
@@ -879,25 +1447,35 @@ namespace GitPuller
                 || output.IndexOf("fatal: Could not read from remote repository", StringComparison.OrdinalIgnoreCase) >= 0;
         }
 
+        // Only needed once an SSH failure triggers the https retry; kept in their own class so
+        // they are constructed on first use rather than at startup.
+        static class SshFallbackPatterns
+        {
+            public static readonly Regex ScpLikeSshUrl = new Regex(@"git@([A-Za-z0-9\.-]+):", RegexOptions.IgnoreCase);
+            public static readonly Regex SshUrl = new Regex(@"ssh://git@([A-Za-z0-9\.-]+)/", RegexOptions.IgnoreCase);
+            public static readonly Regex HttpUrl = new Regex(@"https?://([A-Za-z0-9\.-]+)/", RegexOptions.IgnoreCase);
+            public static readonly Regex HostName = new Regex(@"^[A-Za-z0-9\.-]+$");
+        }
+
         static HashSet<string> ExtractHostsFromText(string text)
         {
             var hosts = new HashSet<string>(StringComparer.OrdinalIgnoreCase);
             if (string.IsNullOrWhiteSpace(text))
                 return hosts;
 
-            foreach (Match m in Regex.Matches(text, @"git@([A-Za-z0-9\.-]+):", RegexOptions.IgnoreCase))
+            foreach (Match m in SshFallbackPatterns.ScpLikeSshUrl.Matches(text))
             {
                 var host = m.Groups[1].Value;
                 if (!string.IsNullOrWhiteSpace(host)) hosts.Add(host);
             }
 
-            foreach (Match m in Regex.Matches(text, @"ssh://git@([A-Za-z0-9\.-]+)/", RegexOptions.IgnoreCase))
+            foreach (Match m in SshFallbackPatterns.SshUrl.Matches(text))
             {
                 var host = m.Groups[1].Value;
                 if (!string.IsNullOrWhiteSpace(host)) hosts.Add(host);
             }
 
-            foreach (Match m in Regex.Matches(text, @"https?://([A-Za-z0-9\.-]+)/", RegexOptions.IgnoreCase))
+            foreach (Match m in SshFallbackPatterns.HttpUrl.Matches(text))
             {
                 var host = m.Groups[1].Value;
                 if (!string.IsNullOrWhiteSpace(host)) hosts.Add(host);
@@ -932,7 +1510,7 @@ namespace GitPuller
                     continue;
 
                 // Defensive: only allow hostnames.
-                if (!Regex.IsMatch(host, @"^[A-Za-z0-9\.-]+$"))
+                if (!SshFallbackPatterns.HostName.IsMatch(host))
                     continue;
 
                 sb.Append($"-c url.\"https://{host}/\".insteadOf=git@{host}: ");
@@ -941,11 +1519,93 @@ namespace GitPuller
             return sb.ToString().Trim();
         }
 
-        static void PrintResult(RepoResult res)
+        static async Task ProcessInParallelAsync(ChannelReader<(RepoCacheEntry Entry, bool Fresh)> repos, List<RepoResult> results)
+        {
+            var writer = new Thread(RunOutputWriter) { IsBackground = true, Name = "Output" };
+            writer.Start();
+
+            try
+            {
+                // git runs as child processes; awaiting them keeps worker threads free instead of
+                // parking one thread per in-flight repo.
+                var options = new ParallelOptions { MaxDegreeOfParallelism = MaxDegreeOfParallelism };
+                await Parallel.ForEachAsync(repos.ReadAllAsync(), options, async (item, _) =>
+                {
+                    OutputQueue.Add(await RunEntryAsync(item.Entry, item.Fresh, results));
+                });
+            }
+            finally
+            {
+                OutputQueue.CompleteAdding();
+                writer.Join();
+            }
+        }
+
+        static async Task<List<(ConsoleColor Color, string Text)>> RunEntryAsync(RepoCacheEntry entry, bool fresh, List<RepoResult> results)
+        {
+            RepoResult res;
+            if (fresh)
+            {
+                // Pulled recently and nothing under .git moved since: no git process needed.
+                res = new RepoResult { Path = entry.Path, Name = Path.GetFileName(entry.Path), Skipped = true };
+            }
+            else
+            {
+                res = await ProcessRepoAsync(entry.Path);
+                RecordPull(entry, res);
+            }
+
+            // Format here, on the worker, so the writer only copies text to the console.
+            var output = FormatResult(res);
+
+            lock (ConsoleLock)
+            {
+                ProcessedCount++;
+                if (res.Failed) FailCount++;
+                else SuccessCount++;
+                if (res.Skipped) SkippedCount++;
+
+                GlobalNewCommitsCount += res.NewCommitsCount;
+
+                results.Add(res);
+            }
+
+            return output;
+        }
+
+        static void RunOutputWriter()
+        {
+            foreach (var output in OutputQueue.GetConsumingEnumerable())
+            {
+                WriteOutput(output);
+
+                // Redraw only once the backlog is drained; intermediate frames would be overwritten anyway.
+                if (OutputQueue.Count == 0)
+                    DrawProgress();
+            }
+        }
+
+        static void WriteOutput(List<(ConsoleColor Color, string Text)> output)
         {
+            if (output.Count == 0)
+                return;
+
+            ClearCurrentLine();
+            foreach (var (color, text) in output)
+            {
+                Console.ForegroundColor = color;
+                Console.Write(text);
+            }
+            Console.ResetColor();
+        }
+
+        static List<(ConsoleColor Color, string Text)> FormatResult(RepoResult res)
+        {
+            var output = new List<(ConsoleColor Color, string Text)>();
             string status;
             ConsoleColor statusColor;
 
+            // Only print to main stream if there's something interesting (Error or New Commits)
             if (res.Failed)
             {
                 status = "[FAILED]";
@@ -959,50 +1619,34 @@ namespace GitPuller
             }
             else
             {
-                return; // Don't print OK repos
+                return output; // Don't print OK repos
             }
 
-            Console.ForegroundColor = statusColor;
-            Console.Write(res.Failed ? "✗ " : "✔ ");
-            Console.ForegroundColor = ConsoleColor.White;
-            Console.Write($"{res.Name,-30} ");
-            Console.ForegroundColor = statusColor;
-            Console.WriteLine(status);
-            Console.ResetColor();
+            output.Add((statusColor, res.Failed ? "✗ " : "✔ "));
+            output.Add((ConsoleColor.White, $"{res.Name,-30} "));
+            output.Add((statusColor, status + Environment.NewLine));
 
-            if (res.Logs.Count > 0)
+            for (int i = 0; i < res.Logs.Count; i++)
             {
-                for (int i = 0; i < res.Logs.Count; i++)
+                var log = res.Logs[i];
+                var isLast = (i == res.Logs.Count - 1);
+                var prefix = isLast ? TreeLast : TreeBranch;
+
+                ConsoleColor color;
+                if (log.IsError) color = ConsoleColor.Red;
+                else if (log.IsWarning) color = ConsoleColor.Yellow;
+                else color = ConsoleColor.Gray;
+
+                // Support multi-line logs just in case, though commits are typically single line in our format
+                var lines = log.Text.Split(LineSeparators, StringSplitOptions.RemoveEmptyEntries);
+                for (int j = 0; j < lines.Length; j++)
                 {
-                    var log = res.Logs[i];
-                    var isLast = (i == res.Logs.Count - 1);
-                    var prefix = isLast ? TreeLast : TreeBranch;
-
-                    Console.ForegroundColor = ConsoleColor.DarkGray;
-                    Console.Write($"   {prefix} ");
-                    
-                    if (log.IsError) Console.ForegroundColor = ConsoleColor.Red;
-                    else if (log.IsWarning) Console.ForegroundColor = ConsoleColor.Yellow;
-                    else if (log.IsCommit) Console.ForegroundColor = ConsoleColor.Gray; 
-                    else Console.ForegroundColor = ConsoleColor.Gray;
-
-                    // Support multi-line logs just in case, though commits are typically single line in our format
-                    var lines = log.Text.Split(new[] { '\r', '\n' }, StringSplitOptions.RemoveEmptyEntries);
-                    for (int j = 0; j < lines.Length; j++)
-                    {
-                        if (j > 0)
-                        {
-                            Console.ForegroundColor = ConsoleColor.DarkGray;
-                            Console.Write($"   {TreeVert} ");
-                            if (log.IsError) Console.ForegroundColor = ConsoleColor.Red;
-                            else if (log.IsWarning) Console.ForegroundColor = ConsoleColor.Yellow;
-                            else Console.ForegroundColor = ConsoleColor.Gray;
-                        }
-                        Console.WriteLine(lines[j]);
-                    }
-                    Console.ResetColor();
+                    output.Add((ConsoleColor.DarkGray, j == 0 ? $"   {prefix} " : $"   {TreeVert} "));
+                    output.Add((color, lines[j] + Environment.NewLine));
                 }
             }
+
+            return output;
         }
 
         static void WriteSummary(List<RepoResult> results, TimeSpan elapsed)
@@ -1016,6 +1660,8 @@ namespace GitPuller
             Console.WriteLine($"Processed:  {TotalRepos}");
             Console.ForegroundColor = ConsoleColor.Green;
             Console.WriteLine($"New Commits:{GlobalNewCommitsCount}");
+            Console.ResetColor();
+            Console.WriteLine($"Skipped:    {SkippedCount} (recently pulled or already up to date)");
             Console.ForegroundColor = ConsoleColor.Red;
             Console.WriteLine($"Failed:     {FailCount}");
             Console.ResetColor();
@@ -1099,9 +1745,20 @@ namespace GitPuller
         public string Name { get; set; } = "";
         public int NewCommitsCount { get; set; }
         public bool Failed { get; set; }
+        public bool Skipped { get; set; }
         public List<LogItem> Logs { get; set; } = new List<LogItem>();
     }
 
+    class RepoCacheEntry
+    {
+        public string Path { get; set; } = "";
+        public DateTime? LastPullUtc { get; set; }
+        public long HeadWriteTicks { get; set; }
+        public long PackedRefsWriteTicks { get; set; }
+        public long FetchHeadWriteTicks { get; set; }
+        public long HeadLogWriteTicks { get; set; }
+    }
+
     class LogItem
     {
         public string Text { get; set; } = "";
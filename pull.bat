@@ -1,4 +1,4 @@
 @echo off
 echo Running GitPuller...
-GitPuller.exe -w 6 --init-missing-submodules
+GitPuller.exe --init-missing-submodules
 pause